@@ -0,0 +1,178 @@
+import threading
+
+import pytest
+
+from yelp_uri._lru import CacheInfo
+from yelp_uri._lru import LRUCache
+from yelp_uri._lru import reconfigure
+from yelp_uri._lru import StripedLRUCache
+
+
+def test_hits_and_misses():
+    cache = LRUCache(2)
+    assert cache.get('a') is None
+    cache.put('a', 1)
+    assert cache.get('a') == 1
+    assert cache.get('b', 'default') == 'default'
+    assert cache.info() == CacheInfo(
+        hits=1, misses=2, evictions=0, maxsize=2, currsize=1, maxbytes=None, currbytes=0,
+    )
+
+
+def test_least_recently_used_is_evicted():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')  # Now 'b' is the least recently used.
+    cache.put('c', 3)
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert 'c' in cache
+    assert cache.info().evictions == 1
+
+
+def test_replace_does_not_evict():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.put('a', 3)
+    assert cache.get('a') == 3
+    assert len(cache) == 2
+    assert cache.info().evictions == 0
+
+
+def test_zero_size_disables():
+    cache = LRUCache(0)
+    cache.put('a', 1)
+    assert 'a' not in cache
+
+
+def test_unbounded():
+    cache = LRUCache(None)
+    for i in range(1000):
+        cache.put(i, i)
+    assert len(cache) == 1000
+
+
+def test_maxbytes():
+    cache = LRUCache(None, maxbytes=10, sizeof=lambda key, value: len(value))
+    cache.put('a', 'xxxx')
+    cache.put('b', 'xxxx')
+    assert cache.info().currbytes == 8
+    cache.put('c', 'xxxx')
+    assert 'a' not in cache
+    assert cache.info().currbytes == 8
+
+    # Entries larger than the whole cache aren't kept.
+    cache.put('d', 'x' * 11)
+    assert 'd' not in cache
+    assert 'b' in cache
+
+    # Nor is the old value of a key whose new one is too large.
+    cache.put('b', 'x' * 11)
+    assert cache.get('b') is None
+    assert cache.info().currbytes == 4
+
+
+@pytest.mark.parametrize('maxbytes', (None, 5))
+def test_resize(maxbytes):
+    cache = LRUCache(None, sizeof=lambda key, value: len(value))
+    for key in 'abcde':
+        cache.put(key, 'xx')
+
+    cache.resize(2, maxbytes)
+    assert list(cache._data) == ['d', 'e']
+    assert cache.info().currbytes == (4 if maxbytes else 0)
+    assert cache.info().evictions == 3
+
+    cache.resize(None)
+    assert cache.info().currbytes == 0
+    cache.put('f', 'xx')
+    assert len(cache) == 3
+
+
+def test_clear():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.get('a')
+    cache.clear()
+    assert 'a' not in cache
+    assert cache.info() == CacheInfo(0, 0, 0, 2, 0, None, 0)
+
+
+@pytest.mark.parametrize('cache', (LRUCache(50), StripedLRUCache(50, stripes=4)), ids=('plain', 'striped'))
+def test_concurrent_use(cache):
+    def hammer(seed):
+        for i in range(2000):
+            key = (seed * i) % 97
+            if cache.get(key) is None:
+                cache.put(key, key)
+
+    threads = [threading.Thread(target=hammer, args=(seed,)) for seed in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    info = cache.info()
+    assert info.hits + info.misses == 8 * 2000
+    assert len(cache) == info.currsize <= 52
+    assert info.currsize + info.evictions <= info.misses
+
+
+def test_striped():
+    cache = StripedLRUCache(10, maxbytes=40, sizeof=lambda key, value: len(value), stripes=4)
+    assert cache.get('a') is None
+    cache.put('a', 'xx')
+    assert cache.get('a') == 'xx'
+    assert 'a' in cache
+    assert cache.info() == CacheInfo(1, 1, 0, 10, 1, 40, 2)
+
+    # The stripes hold 3, 3, 2 and 2 entries, and 10 bytes each.
+    for key in range(100):
+        cache.put(key, 'xx')
+    assert len(cache) <= 10
+    assert cache.info().currbytes <= 40
+
+    cache.resize(4)
+    assert len(cache) <= 4
+    assert cache.info().currbytes == 0
+    cache.clear()
+    assert cache.info() == CacheInfo(0, 0, 0, 4, 0, None, 0)
+
+
+@pytest.mark.parametrize('maxsize', (1, 3, 9))
+def test_striped_bounds_are_exact(maxsize):
+    cache = StripedLRUCache(maxsize, maxbytes=maxsize, sizeof=lambda key, value: 1, stripes=8)
+    for key in range(100):
+        cache.put(key, key)
+    assert len(cache) <= maxsize
+    assert cache.info().currbytes <= maxsize
+
+    cache.resize(maxsize + 1, maxsize + 1)
+    for key in range(100):
+        cache.put(key, key)
+    assert len(cache) <= maxsize + 1
+
+
+def test_striped_needs_a_stripe():
+    with pytest.raises(ValueError):
+        StripedLRUCache(stripes=0)
+
+
+def test_reconfigure():
+    sizeof = lambda key, value: len(value)  # noqa: E731
+    cache = LRUCache(10, sizeof=sizeof)
+    cache.put('a', 'xx')
+    assert reconfigure(cache, 5) is cache
+    assert cache.maxsize == 5 and 'a' in cache
+
+    striped = reconfigure(cache, 8, 100, stripes=2)
+    assert isinstance(striped, StripedLRUCache)
+    assert (striped.stripes, striped.maxsize, striped.maxbytes, len(striped)) == (2, 8, 100, 0)
+    assert striped.sizeof is sizeof
+    assert reconfigure(striped, 4, stripes=2) is striped
+
+    plain = reconfigure(striped, 3)
+    assert isinstance(plain, LRUCache)
+    assert (plain.maxsize, plain.sizeof) == (3, sizeof)
@@ -102,6 +102,23 @@ class UrlParseTestCase(unittest.TestCase):
             result = urlparse.parse_qsl(orig, keep_blank_values=True)
             self.assertEqual(result, expect, "Error parsing %s" % repr(orig))
 
+    def test_unquote(self):
+        for quoted, unquoted in [
+                ("", ""),
+                ("abc", "abc"),
+                ("abc%20def", "abc def"),
+                ("%7e%7E%41", "~~A"),
+                ("100%", "100%"),
+                ("100% off", "100% off"),
+                ("%%41%", "%A%"),
+                ("%zz%4", "%zz%4"),
+                ("%E2%98%83", "\xe2\x98\x83"),
+                ("a+b", "a+b"),
+        ]:
+            self.assertEqual(urlparse.unquote(quoted), unquoted)
+            self.assertEqual(urlparse.unquote_plus(quoted), unquoted.replace('+', ' '))
+        self.assertEqual(urlparse.unquote_plus("a+b%2B"), "a b+")
+
     def test_qs(self):
         for orig, expect in parse_qs_test_cases:
             result = urlparse.parse_qs(orig, keep_blank_values=True)
@@ -345,6 +362,30 @@ class UrlParseTestCase(unittest.TestCase):
         self.checkJoin(SIMPLE_BASE, 'http:g?y', 'http://a/b/c/g?y')
         self.checkJoin(SIMPLE_BASE, 'http:g?y/./x', 'http://a/b/c/g?y/./x')
 
+    def test_remove_dot_segments(self):
+        # RFC 3986, section 5.2.4
+        for path, expected in [
+                ('/a/b/c/./../../g', '/a/g'),
+                ('mid/content=5/../6', 'mid/6'),
+                ('/../g', '/g'),
+                ('../g', 'g'),
+                ('a/..', '/'),
+                ('a/b/..', 'a/'),
+                ('/a/b/.', '/a/b/'),
+                ('.', ''),
+                ('..', ''),
+                ('/', '/'),
+                ('', ''),
+                ('/a.b/.c', '/a.b/.c'),
+        ]:
+            self.assertEqual(urlparse.remove_dot_segments(path), expected)
+
+    def test_urljoin_long_paths(self):
+        base = 'http://a/' + 'b/' * 5000
+        self.assertEqual(urlparse.urljoin(base, '../' * 4999 + 'g'), 'http://a/b/g')
+        self.assertEqual(urlparse.urljoin(base, '../' * 5002 + 'g'), 'http://a/../../g')
+        self.assertEqual(urlparse.remove_dot_segments('/a' + '/b/..' * 5000), '/a/')
+
     def test_urldefrag(self):
         for url, defrag, frag in [
                 ('http://python.org#frag', 'http://python.org', 'frag'),
@@ -360,6 +401,14 @@ class UrlParseTestCase(unittest.TestCase):
         ]:
             self.assertEqual(urlparse.urldefrag(url), (defrag, frag))
 
+    def test_urldefrag_matches_full_parse(self):
+        for url in [
+                'HTTP://a/b#f', 'Http://a/b?q#f', 'http://a/b?#f', 'http://a/b;#f',
+                'http://a/b;p#f', 'http:#f', 'http://#f', '//a?#', '#', 'a b:c?#d', '1:x#y',
+        ]:
+            s, n, p, a, q, frag = urlparse.urlparse(url)
+            self.assertEqual(urlparse.urldefrag(url), (urlparse.urlunparse((s, n, p, a, q, '')), frag))
+
     def test_urlsplit_attributes(self):
         url = "HTTP://WWW.PYTHON.ORG/doc/#frag"
         p = urlparse.urlsplit(url)
@@ -450,6 +499,23 @@ class UrlParseTestCase(unittest.TestCase):
         self.assertEqual(type(p.hostname), type(uri))
         self.assertEqual(type(p.path), type(uri))
 
+    def test_cache_is_lru(self):
+        urlparse.clear_cache()
+        self.addCleanup(urlparse.clear_cache)
+        self.addCleanup(urlparse.configure_cache)
+        urlparse.configure_cache(maxsize=2)
+
+        hot = urlparse.urlsplit("http://example.com/hot")
+        for i in range(10):
+            urlparse.urlsplit("http://example.com/%d" % i)
+            self.assertIs(urlparse.urlsplit("http://example.com/hot"), hot)
+
+        info = urlparse.cache_info()
+        self.assertEqual(info.hits, 10)
+        self.assertEqual(info.misses, 11)
+        self.assertEqual(info.evictions, 9)
+        self.assertEqual(info.currsize, 2)
+
     def test_noslash(self):
         # Issue 1637: http://foo.com?query is legal
         self.assertEqual(urlparse.urlparse("http://example.com?blahblah=/foo"),
@@ -462,6 +528,18 @@ class UrlParseTestCase(unittest.TestCase):
         self.assertEqual(urlparse.urlparse("x-newscheme://foo.com/stuff"),
                          ('x-newscheme', 'foo.com', '/stuff', '', '', ''))
 
+    def test_known_schemes(self):
+        for url, expected in [
+                ("https://a/b", ('https', 'a', '/b', '', '')),
+                ("HTTPS://a/b", ('https', 'a', '/b', '', '')),
+                ("Mailto:x@y?subject=z", ('mailto', None, 'x@y', 'subject=z', '')),
+                ("tel:+1-555-0100", ('tel', None, '+1-555-0100', '', '')),
+                ("hTtPs://a", ('https', 'a', '', '', '')),
+                ("svn+SSH://a", ('svn+ssh', 'a', '', '', '')),
+                ("not a scheme:b", ('', None, 'not a scheme:b', '', '')),
+        ]:
+            self.assertEqual(urlparse.urlsplit(url), expected)
+
     def test_split_relative_urls(self):
         self.assertEqual(urlparse.urlparse("x-newscheme:stuff"),
                          ('x-newscheme', None, 'stuff', '', '', ''))
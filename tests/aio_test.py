@@ -0,0 +1,99 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import yelp_uri.encoding as E
+from yelp_uri.aio import find_urls_async
+from yelp_uri.aio import recode_many_async
+from yelp_uri.aio import recode_uri_async
+from yelp_uri.search import email_regex
+from yelp_uri.search import url_regex
+
+
+def review_text(words=20000, seed=0):
+    """A long review, with urls, emails and near-misses among the words."""
+    rand = random.Random(seed)
+    vocabulary = (
+        'the', 'food', 'was', 'great.', '(see', 'www.yelp.com/biz/a_(b))', 'http://m.yelp.com:80/x?y#z',
+        'me@yelp.com', 'yelp.com.', 'mailto://you@yelp.co.uk', 'a.b', '☃.com', '...', 'http://',
+    )
+    separators = (' ', ' ', '\n', '\t', '')
+    return ''.join(rand.choice(vocabulary) + rand.choice(separators) for _ in range(words))
+
+
+async def collect(matches):
+    return [(match.span(), match.groups()) async for match in matches]
+
+
+def expected(regex, text):
+    return [(match.span(), match.groups()) for match in regex.finditer(text)]
+
+
+def test_recode_uri_async():
+    uri = 'http://m\xfcnchen.com/m\xfcnchen?☃'
+    assert asyncio.run(recode_uri_async(uri)) == E.recode_uri(uri)
+
+
+def test_recode_uri_async_malformed():
+    with pytest.raises(E.MalformedUrlError):
+        asyncio.run(recode_uri_async('http://yelp.com:http/'))
+
+
+@pytest.mark.parametrize('count', (0, 1, 250))
+def test_recode_many_async(count):
+    uris = ['http://m\xfcnchen.com/%d?☃' % i for i in range(count)]
+    with ThreadPoolExecutor(2) as executor:
+        results = asyncio.run(recode_many_async(iter(uris), executor, chunksize=7))
+    assert results == [E.recode_uri(uri) for uri in uris]
+
+
+def test_recode_many_async_bad_chunksize():
+    with pytest.raises(ValueError):
+        asyncio.run(recode_many_async([], chunksize=0))
+
+
+@pytest.mark.parametrize('regex', (url_regex, email_regex))
+@pytest.mark.parametrize('window', (1, 10, 1000, 10 ** 6))
+def test_find_urls_async(regex, window):
+    text = review_text(words=3000)
+    assert asyncio.run(collect(find_urls_async(text, regex, window))) == expected(regex, text)
+
+
+@pytest.mark.parametrize('text', ('', ' ', 'www.yelp.com', ' www.yelp.com\n', 'nowhitespacewww.yelp.com'))
+def test_find_urls_async_edges(text):
+    assert asyncio.run(collect(find_urls_async(text, window=2))) == expected(url_regex, text)
+
+
+def test_find_urls_async_bad_window():
+    with pytest.raises(ValueError):
+        asyncio.run(collect(find_urls_async('www.yelp.com', window=0)))
+
+
+def test_find_urls_async_does_not_stall():
+    text = review_text()
+    start = time.perf_counter()
+    matches = expected(url_regex, text)
+    blocking = time.perf_counter() - start
+
+    async def main():
+        stalls = []
+
+        async def ticker():
+            while True:
+                before = time.perf_counter()
+                await asyncio.sleep(0)
+                stalls.append(time.perf_counter() - before)
+
+        task = asyncio.ensure_future(ticker())
+        await asyncio.sleep(0)
+        found = await collect(find_urls_async(text))
+        task.cancel()
+        return found, max(stalls)
+
+    found, worst_stall = asyncio.run(main())
+    assert found == matches
+    # The search is split into dozens of windows, so no single one should come near the whole.
+    assert worst_stall < blocking / 4, (worst_stall, blocking)
@@ -0,0 +1,130 @@
+import pytest
+
+from yelp_uri._urlparse_less_special import parse_qs
+from yelp_uri._urlparse_less_special import parse_qsl
+from yelp_uri._urlparse_less_special import unquote
+from yelp_uri.query import iter_qsl
+from yelp_uri.query import QueryDict
+from yelp_uri.query import QueryStringParser
+
+
+QUERIES = (
+    '',
+    '&',
+    '&&',
+    '=',
+    '=a',
+    'a',
+    'a=',
+    '&a=b',
+    'a=a+b&b=b+c',
+    'a=1&a=2',
+    'a=1;b=2&c',
+    'a=%41%zz&b=%E2%98%83',
+)
+
+
+@pytest.mark.parametrize('query', QUERIES)
+@pytest.mark.parametrize('keep_blank_values', (False, True))
+def test_iter_qsl_matches_parse_qsl(query, keep_blank_values):
+    assert list(iter_qsl(query, keep_blank_values)) == parse_qsl(query, keep_blank_values)
+
+
+def test_iter_qsl_is_lazy():
+    pairs = iter_qsl('a=1&b=%zz;c')
+    assert next(pairs) == ('a', '1')
+    assert list(pairs) == [('b', '%zz')]
+
+    pairs = iter_qsl('a=1&b', strict_parsing=True)
+    assert next(pairs) == ('a', '1')
+    with pytest.raises(ValueError):
+        next(pairs)
+
+
+def test_query_string_parser():
+    body = 'a=a+b&b=b%20c;&c=&d&a=%E2%98%83'
+    expect = parse_qsl(body, keep_blank_values=True)
+    # Feed the body in two chunks, split at each possible point.
+    for i in range(len(body) + 1):
+        parser = QueryStringParser(keep_blank_values=True)
+        assert parser.feed(body[:i]) + parser.feed(body[i:]) + parser.close() == expect, (body[:i], body[i:])
+
+    parser = QueryStringParser()
+    expect = parse_qsl(body)
+    assert [pair for char in body for pair in parser.feed(char)] == expect[:-1]
+    assert parser.close() == expect[-1:]
+
+
+def test_query_string_parser_bytes():
+    body = 'a=a+b&b=☃;c=%E2%98%83'.encode('utf-8')
+    expect = [('a', 'a b'), ('b', '☃'), ('c', unquote('%E2%98%83'))]
+    # Even a character split across chunks is decoded.
+    for i in range(len(body) + 1):
+        parser = QueryStringParser()
+        assert parser.feed(body[:i]) + parser.feed(body[i:]) + parser.close() == expect, (body[:i], body[i:])
+
+    parser = QueryStringParser(encoding='latin-1')
+    assert parser.feed(b'a=\xfc') + parser.close() == [('a', '\xfc')]
+
+
+def test_query_string_parser_limits():
+    parser = QueryStringParser(max_fields=2)
+    assert parser.feed('a=1&b=2&') == [('a', '1'), ('b', '2')]
+    with pytest.raises(ValueError):
+        parser.feed('c=3&')
+
+    parser = QueryStringParser(max_field_length=5)
+    assert parser.feed('a=123&b=') == [('a', '123')]
+    assert parser.feed('12') == []
+    # We don't wait for the end of the field to reject it.
+    with pytest.raises(ValueError):
+        parser.feed('34')
+
+    parser = QueryStringParser(max_field_length=5)
+    with pytest.raises(ValueError):
+        parser.feed('a=1234&b=1')
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_query_dict_matches_parse_qs(query):
+    result = QueryDict(query, keep_blank_values=True)
+    assert dict(result.lists()) == parse_qs(query, keep_blank_values=True)
+    assert result.pairs() == parse_qsl(query, keep_blank_values=True)
+
+
+def test_query_dict_drops_blank_values():
+    assert QueryDict('a=&b').pairs() == []
+
+
+def test_query_dict_access():
+    query = QueryDict('a=1&b=x+y&a=2;c=%7E')
+    assert query['a'] == '1'
+    assert query.get('b') == 'x y'
+    assert query.get('missing', 'default') == 'default'
+    with pytest.raises(KeyError):
+        query['missing']
+    assert query.getlist('a') == ['1', '2']
+    assert query.getlist('missing') == []
+    assert list(query) == ['a', 'b', 'c']
+    assert len(query) == 3
+    assert 'c' in query
+    assert query.items() == [('a', '1'), ('b', 'x y'), ('c', '~')]
+
+
+def test_query_dict_lazy():
+    query = QueryDict('a=%41&b=%42')
+    assert query['b'] == 'B'
+    assert query._values == [None, 'B']
+
+
+def test_query_dict_urlencode():
+    query = QueryDict('a=%7e&b=x+y;a=2&c=3')
+    # Untouched fields are re-serialized verbatim.
+    assert query.urlencode() == 'a=%7e&b=x+y&a=2&c=3'
+
+    query['a'] = 'one & two'
+    query.appendlist('d', '4')
+    del query['c']
+    assert query.urlencode() == 'a=one+%26+two&b=x+y&d=4'
+    assert query.pairs() == [('a', 'one & two'), ('b', 'x y'), ('d', '4')]
+    assert query == QueryDict(query.urlencode())
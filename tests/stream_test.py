@@ -0,0 +1,108 @@
+import gzip
+import io
+import os
+
+import pytest
+
+import yelp_uri
+from yelp_uri import stream
+
+
+LOG = (
+    b'1.2.3.4 - - [18/Oct/2026:10:00:00] "GET /biz/m\xc3\xbcnchen HTTP/1.1" 200 http://www.yelp.com/biz/m\xc3\xbcnchen\n'
+    b'1.2.3.5 - - [18/Oct/2026:10:00:01] "GET / HTTP/1.1" 200 http://yelp.com:bad/\r\n'
+    b'truncated line\n'
+    b'\n'
+    b'1.2.3.6 - - [18/Oct/2026:10:00:02] "GET / HTTP/1.1" 200 https://www.yelp.com/?q=1'
+)
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    path = tmp_path / 'access.log'
+    path.write_bytes(LOG)
+    return path
+
+
+def test_iter_lines_path(log_path):
+    assert list(stream.iter_lines(log_path)) == LOG.replace(b'\r', b'').split(b'\n')
+    assert list(stream.iter_lines(str(log_path))) == list(stream.iter_lines(log_path))
+
+
+def test_iter_lines_file(log_path):
+    with open(log_path, 'rb') as log:
+        assert list(stream.iter_lines(log)) == list(stream.iter_lines(log_path))
+
+
+def test_iter_lines_file_position(log_path):
+    with open(log_path, 'rb') as log:
+        log.readline()
+        assert list(stream.iter_lines(log)) == list(stream.iter_lines(log_path))[1:]
+
+
+def test_iter_lines_gzip_file(tmp_path):
+    path = tmp_path / 'access.log.gz'
+    with gzip.open(path, 'wb') as log:
+        log.write(LOG)
+    with gzip.open(path, 'rb') as log:
+        assert list(stream.iter_lines(log)) == LOG.replace(b'\r', b'').split(b'\n')
+
+
+def test_iter_lines_pipe():
+    read_fd, write_fd = os.pipe()
+    with open(write_fd, 'wb') as writer:
+        writer.write(LOG)
+    with open(read_fd, 'rb') as reader:
+        assert list(stream.iter_lines(reader)) == LOG.replace(b'\r', b'').split(b'\n')
+
+
+def test_iter_lines_text_file(log_path):
+    with open(log_path, encoding='UTF-8') as log:
+        assert list(stream.iter_lines(log))[0].endswith('m\xfcnchen')
+
+
+def test_iter_lines_unmappable():
+    assert list(stream.iter_lines(io.BytesIO(LOG))) == LOG.replace(b'\r', b'').split(b'\n')
+    assert list(stream.iter_lines(io.StringIO('a\nb\r\n'))) == ['a', 'b']
+
+
+def test_iter_lines_empty(tmp_path):
+    path = tmp_path / 'empty.log'
+    path.write_bytes(b'')
+    assert list(stream.iter_lines(path)) == []
+
+
+def test_field():
+    extract = stream.field(1)
+    assert extract(b'a  b c') == b'b'
+    assert extract(b'a') is None
+    assert stream.field(2, sep=',')('a,b,c,d') == 'c'
+
+
+def test_iter_urls(log_path):
+    assert list(stream.iter_urls(log_path, stream.field(8))) == [
+        b'http://www.yelp.com/biz/m\xc3\xbcnchen',
+        b'http://yelp.com:bad/',
+        b'https://www.yelp.com/?q=1',
+    ]
+
+
+def test_split_urls(log_path):
+    urls = stream.iter_urls(log_path, stream.field(8))
+    hosts = [split.hostname for split in stream.split_urls(urls, skip_malformed=True)]
+    assert hosts == ['www.yelp.com', 'www.yelp.com']
+
+
+def test_split_urls_malformed(log_path):
+    splits = stream.split_urls(stream.iter_urls(log_path, stream.field(8)), split=yelp_uri.urlsplit_bytes)
+    assert next(splits).path == b'/biz/m\xc3\xbcnchen'
+    with pytest.raises(yelp_uri.MalformedUrlError):
+        next(splits)
+
+
+def test_recode_urls(log_path):
+    urls = stream.iter_urls(log_path, stream.field(8))
+    assert list(stream.recode_urls(urls, skip_malformed=True)) == [
+        'http://www.yelp.com/biz/m%C3%BCnchen',
+        'https://www.yelp.com/?q=1',
+    ]
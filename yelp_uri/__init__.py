@@ -9,6 +9,9 @@ Because email addresses resemble uris in several regards, we handle them under t
 """
 # This namespace reserved for *very* general-purpse uri functions.
 import re
+from array import array
+from codecs import latin_1_decode
+from collections.abc import Sequence
 try:
     from string import ascii_letters as LETTERS
 except ImportError:
@@ -19,6 +22,14 @@ from collections import namedtuple
 from yelp_bytes import from_bytes
 
 import yelp_uri._urlparse_less_special as _urlparse
+from yelp_uri._urlparse_less_special import remove_dot_segments
+from yelp_uri._urlparse_less_special import unquote_plus
+from yelp_uri._lru import LRUCache
+from yelp_uri._lru import parts_sizeof
+from yelp_uri._lru import reconfigure
+from yelp_uri.query import iter_qsl
+from yelp_uri.query import QueryDict
+from yelp_uri.query import QueryStringParser
 
 
 class MalformedUrlError(UnicodeError):
@@ -101,19 +112,38 @@ RFC3986 = RFC3986()
 
 def netlocsplit(netloc):
     "Split a `netloc` into its component parts."
-    # Leverage the code already implemented in urlparse.ResultMixin
-    tmp = _urlparse.ResultMixin()
-    tmp.netloc = netloc
+    return NetlocSplitResult(*_netlocsplit(netloc))
+
+
+def _netlocsplit(netloc):
+    """Split a `netloc` into a (username, password, hostname, port) tuple, in a single pass.
+    This matches urlparse.ResultMixin, which re-splits the netloc for each attribute.
+    """
+    if netloc is None:
+        return None, None, None, None
+
+    userinfo, at, hostport = netloc.rpartition('@')
+    if at:
+        username, colon, password = userinfo.partition(':')
+        if not colon:
+            password = None
+    else:
+        username = password = None
+
+    hostname, colon, port = hostport.partition(':')
+    port = _parse_port(port) if colon else None
+
+    if _intern_table is not None:
+        username, hostname, port = _intern(username), _intern(hostname), _intern(port)
+    return username, password, hostname, port
+
+
+def _parse_port(port):
     try:
-        port = tmp.port
+        return int(port, 10)
     except ValueError as error:
         # Make this error a little more explicit and catch-able.
-        if len(error.args) == 1 and isinstance(error.args[0], str):
-            raise MalformedUrlError('Invalid port number: ' + error.args[0])
-        else:  # An exception I don't expect
-            raise
-
-    return NetlocSplitResult(tmp.username, tmp.password, tmp.hostname, port)
+        raise MalformedUrlError('Invalid port number: ' + error.args[0])
 
 
 def netlocunsplit(split_netloc):
@@ -144,17 +174,118 @@ class NetlocSplitResult(namedtuple('NetlocSplitResult', 'username password hostn
         return netlocunsplit(self)
 
 
+INTERN_TABLE_SIZE = 4096
+_intern_table = None
+
+
+def configure_interning(maxsize=INTERN_TABLE_SIZE):
+    """Share one object between the equal schemes, usernames, hostnames and ports of split urls,
+    which saves memory when many SplitResults are kept. This is off by default.
+    Only the `maxsize` most recently seen values are remembered, so that a stream of
+    distinct hostnames can't grow the table without limit. A `maxsize` of 0 turns interning off.
+    """
+    global _intern_table
+    _intern_table = LRUCache(maxsize) if maxsize else None
+
+
+def interning_info():
+    """Return a CacheInfo for the intern table, or None if interning is off."""
+    table = _intern_table
+    return None if table is None else table.info()
+
+
+def _intern(value):
+    table = _intern_table
+    if table is None or value is None:
+        return value
+    interned = table.get(value)
+    if interned is None:
+        table.put(value, value)
+        return value
+    return interned
+
+
+URLSPLIT_CACHE_SIZE = 1024
+
+
+_split_cache = LRUCache(URLSPLIT_CACHE_SIZE, sizeof=parts_sizeof)
+
+
 def urlsplit(url):
     """Similar to stdlib urlparse.urlsplit, but splits the url into more parts.
+    Results are cached; see `configure_urlsplit_cache`.
 
     url -- string url to be parsed.
     return -- a yelp.uri.SplitResult
     """
-    url = _urlparse.urlsplit(
-        from_bytes(url) if isinstance(url, bytes) else url
+    cached = _split_cache.get(url)
+    if cached is not None:
+        return cached
+
+    # Not _urlparse.urlsplit: its cache would only hold a second copy of each url.
+    split_url = _urlparse._urlsplit(
+        from_bytes(url) if isinstance(url, bytes) else url, '', True,
+    )
+    username, password, hostname, port = _netlocsplit(split_url.netloc)
+    result = SplitResult(
+        _intern(split_url.scheme), username, password, hostname, port,
+        split_url.path, split_url.query, split_url.fragment,
     )
-    nl = netlocsplit(url.netloc)
-    return SplitResult(url.scheme, nl.username, nl.password, nl.hostname, nl.port, url.path, url.query, url.fragment)
+    _split_cache.put(url, result)
+    return result
+
+
+def urlsplit_cache_info():
+    """Return a CacheInfo of the `urlsplit` cache's hits, misses, evictions and size."""
+    return _split_cache.info()
+
+
+def clear_urlsplit_cache():
+    """Empty the `urlsplit` cache and reset its statistics."""
+    _split_cache.clear()
+
+
+def configure_urlsplit_cache(maxsize=URLSPLIT_CACHE_SIZE, maxbytes=None, stripes=1):
+    """Bound the `urlsplit` cache to `maxsize` entries and, optionally, about `maxbytes` bytes of memory.
+    A `maxsize` of None means unbounded, and 0 disables the cache.
+    With more than one of `stripes`, threads contend less for the cache, but eviction is only
+    approximately least-recently-used, and the bounds are divided between the stripes, so
+    each holds a smaller share of them. Changing the number of stripes empties the cache.
+    """
+    global _split_cache
+    _split_cache = reconfigure(_split_cache, maxsize, maxbytes, stripes)
+
+
+def urlsplit_many(urls):
+    """Split many urls at once, returning the results by column rather than by row.
+    This avoids building a SplitResult per url, which matters when processing logs in bulk.
+
+    urls -- an iterable of string urls; bytes are decoded as in `urlsplit`.
+    return -- a yelp.uri.SplitColumns, whose fields are lists with one entry per url.
+    """
+    columns = SplitColumns([], [], [], [], [], [], [], [])
+    (
+        add_scheme, add_username, add_password, add_hostname,
+        add_port, add_path, add_query, add_fragment,
+    ) = [column.append for column in columns]
+    # Bulk input is rarely repeated, so we skip the parse cache.
+    split, split_netloc = _urlparse._urlsplit, _netlocsplit
+
+    for url in urls:
+        if isinstance(url, bytes):
+            url = from_bytes(url)
+        scheme, netloc, path, query, fragment = split(url, '', True)
+        username, password, hostname, port = split_netloc(netloc)
+        add_scheme(_intern(scheme))
+        add_username(username)
+        add_password(password)
+        add_hostname(hostname)
+        add_port(port)
+        add_path(path)
+        add_query(query)
+        add_fragment(fragment)
+
+    return columns
 
 
 def urlunsplit(split_url):
@@ -183,18 +314,386 @@ class SplitResult(namedtuple('SplitResult', 'scheme username password hostname p
     def netloc(self):
         return NetlocSplitResult(self.username, self.password, self.hostname, self.port)
 
+    @property
+    def query_params(self):
+        """The query, parsed into a QueryDict. Values are only unquoted as they're read."""
+        return QueryDict(self.query or '', keep_blank_values=True)
+
     def replace(self, **kwargs):
         """_replace has been promoted to a public method"""
         return self._replace(**kwargs)
 
 
+class SplitColumns(namedtuple('SplitColumns', SplitResult._fields)):
+    """A result from yelp.uri.urlsplit_many: one list per SplitResult field."""
+
+    __slots__ = ()
+
+    def rows(self):
+        """Iterate over the urls as SplitResults."""
+        return map(SplitResult, *self)
+
+
+def urlsplit_lazy(url):
+    """Like `urlsplit`, but components are only sliced out of the url when they're accessed.
+    This is cheaper when only one or two parts of the url are needed.
+
+    url -- string url to be parsed.
+    return -- a yelp.uri.LazySplitResult
+    """
+    if isinstance(url, bytes):
+        url = from_bytes(url)
+    offsets = _split_offsets(url)
+    port = None if offsets[8] < 0 else _parse_port(url[offsets[8]:offsets[9]])
+    return LazySplitResult(url, array('i', offsets), port)
+
+
+def urlsplit_bytes(url):
+    """Like `urlsplit`, but splits a bytes url into bytes components, without guessing its encoding.
+    The components can be decoded afterward if needed, for example by
+    yelp_uri.encoding.decode_split_uri, which decodes each of them separately.
+
+    url -- a bytes-like url: bytes, bytearray or memoryview.
+    return -- a yelp.uri.SplitResult of bytes, except for the port, which is an int.
+    """
+    # The components are found in a latin-1 copy of the whole url, as a str. latin-1 maps each
+    # byte to exactly one character, so the offsets carry over, and the components are then
+    # copied out of the original bytes.
+    if isinstance(url, bytes):
+        text = url.decode('latin-1')
+    else:
+        url = memoryview(url).cast('B')
+        text = latin_1_decode(url)[0]
+    offsets = iter(_split_offsets(text))
+
+    parts = [None if start < 0 else bytes(url[start:end]) for start, end in zip(offsets, offsets)]
+    parts[0] = parts[0].lower()
+    port = parts[4]
+    if port is not None:
+        parts[4] = int(port, 10) if port.isdigit() else _parse_port(from_bytes(port))
+    return SplitResult._make(parts)
+
+
+def _split_offsets(url):
+    """Find the components of `url`, as `_urlparse.urlsplit` and `_netlocsplit` would.
+    return -- a tuple of a (start, end) pair per SplitResult field.
+        Missing (None) components have a start of -1.
+    """
+    end = len(url)
+    scheme_end = _find_scheme(url)
+    netloc_start, pos = _find_netloc(url, scheme_end)
+
+    if netloc_start >= 0:
+        at = url.rfind('@', netloc_start, pos)
+        if at >= 0:
+            host_start = at + 1
+            colon = url.find(':', netloc_start, at)
+            if colon >= 0:
+                userinfo = (netloc_start, colon, colon + 1, at)
+            else:
+                userinfo = (netloc_start, at, -1, -1)
+        else:
+            host_start = netloc_start
+            userinfo = (-1, -1, -1, -1)
+
+        colon = url.find(':', host_start, pos)
+        if colon >= 0:
+            hostport = (host_start, colon, colon + 1, pos)
+        else:
+            hostport = (host_start, pos, -1, -1)
+    else:
+        userinfo = hostport = (-1, -1, -1, -1)
+
+    hash_ = url.find('#', pos)
+    if hash_ >= 0:
+        fragment = (hash_ + 1, end)
+        end = hash_
+    else:
+        fragment = (end, end)
+    question = url.find('?', pos, end)
+    if question >= 0:
+        pathquery = (pos, question, question + 1, end)
+    else:
+        pathquery = (pos, end, end, end)
+
+    return (0, scheme_end) + userinfo + hostport + pathquery + fragment
+
+
+def _find_scheme(url):
+    """Return the end of the scheme of `url`, or 0 if it has none."""
+    pos = url.find(':')
+    if pos > 0 and not url[:pos].strip(_urlparse.scheme_chars):
+        return pos
+    return 0
+
+
+def _find_netloc(url, scheme_end):
+    """Return the (start, end) of the netloc of `url`, given the end of its scheme.
+    If there's no netloc, start is -1. Either way, the path starts at `end`.
+    """
+    pos = scheme_end + 1 if scheme_end else 0
+    if not url.startswith('//', pos):
+        return -1, pos
+
+    start = pos + 2
+    end = len(url)
+    for delim in '/?#':
+        delim = url.find(delim, start, end)
+        if delim >= 0:
+            end = delim
+    return start, end
+
+
+def _find_hostport(url):
+    """Return the (start, colon, end) of the host and port of `url`; start is -1 if it has no netloc.
+    colon is the position of the ':' before the port, or -1 if there is none.
+    """
+    start, end = _find_netloc(url, _find_scheme(url))
+    if start < 0:
+        return -1, -1, end
+    at = url.rfind('@', start, end)
+    if at >= 0:
+        start = at + 1
+    return start, url.find(':', start, end), end
+
+
+def scheme_of(url):
+    """Return just the (lower-cased) scheme of `url`, as in `urlsplit(url).scheme`.
+    These extractors scan only as far into the url as they need to, and don't touch the cache.
+    """
+    if isinstance(url, bytes):
+        url = from_bytes(url)
+    return url[:_find_scheme(url)].lower()
+
+
+def host_of(url):
+    """Return just the hostname of `url`, as in `urlsplit(url).hostname`.
+    Unlike urlsplit, this doesn't check the port number.
+    """
+    if isinstance(url, bytes):
+        url = from_bytes(url)
+    start, colon, end = _find_hostport(url)
+    if start < 0:
+        return None
+    return url[start:end if colon < 0 else colon]
+
+
+def port_of(url):
+    """Return just the port of `url`, as in `urlsplit(url).port`."""
+    if isinstance(url, bytes):
+        url = from_bytes(url)
+    _, colon, end = _find_hostport(url)
+    if colon < 0:
+        return None
+    return _parse_port(url[colon + 1:end])
+
+
+def path_of(url):
+    """Return just the path of `url`, as in `urlsplit(url).path`."""
+    if isinstance(url, bytes):
+        url = from_bytes(url)
+    _, start = _find_netloc(url, _find_scheme(url))
+    end = len(url)
+    for delim in '?#':
+        delim = url.find(delim, start, end)
+        if delim >= 0:
+            end = delim
+    return url[start:end]
+
+
+def strip_fragment(url):
+    """Return `url` without its fragment (or '#'), and otherwise untouched,
+    so that `urlsplit(strip_fragment(url)) == urlsplit(url).replace(fragment='')`.
+    """
+    if isinstance(url, bytes):
+        url = from_bytes(url)
+    return url.partition('#')[0]
+
+
+class LazySplitResult(Sequence):
+    """A drop-in replacement for yelp.uri.SplitResult, from yelp.uri.urlsplit_lazy.
+    It holds only the original url and the offsets of its components.
+    """
+
+    __slots__ = ('_url', '_offsets', '_port')
+    _fields = SplitResult._fields
+
+    def __init__(self, url, offsets, port):
+        self._url = url
+        self._offsets = offsets
+        self._port = port
+
+    def _slice(self, field):
+        start = self._offsets[2 * field]
+        if start < 0:
+            return None
+        return self._url[start:self._offsets[2 * field + 1]]
+
+    @property
+    def scheme(self):
+        return self._slice(0).lower()
+
+    @property
+    def username(self):
+        return self._slice(1)
+
+    @property
+    def password(self):
+        return self._slice(2)
+
+    @property
+    def hostname(self):
+        return self._slice(3)
+
+    @property
+    def port(self):
+        return self._port
+
+    @property
+    def path(self):
+        return self._slice(5)
+
+    @property
+    def query(self):
+        return self._slice(6)
+
+    @property
+    def fragment(self):
+        return self._slice(7)
+
+    @property
+    def netloc(self):
+        return NetlocSplitResult(self.username, self.password, self.hostname, self._port)
+
+    query_params = SplitResult.query_params
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __iter__(self):
+        yield self.scheme
+        for field in (1, 2, 3):
+            yield self._slice(field)
+        yield self._port
+        for field in (5, 6, 7):
+            yield self._slice(field)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self)[index]
+        return getattr(self, self._fields[index])
+
+    def __eq__(self, other):
+        if isinstance(other, (tuple, LazySplitResult)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return 'LazySplitResult({})'.format(
+            ', '.join(f'{name}={value!r}' for name, value in zip(self._fields, self)),
+        )
+
+    def __reduce__(self):
+        return (urlsplit_lazy, (self._url,))
+
+    def geturl(self):
+        """Return the original url, unless urlunsplit would normalize it."""
+        url, offsets = self._url, self._offsets
+        scheme = url[:offsets[1]]
+        if (
+                scheme != scheme.lower() or
+                # An empty query or fragment loses its delimiter.
+                offsets[11] != offsets[12] == offsets[13] or
+                offsets[14] == len(url) and url.endswith('#') or
+                # The port is written as an integer.
+                self._port is not None and url[offsets[8]:offsets[9]] != str(self._port)
+        ):
+            return urlunsplit(self)
+        return url
+
+    def replace(self, **kwargs):
+        """Return a SplitResult, with some fields replaced."""
+        return SplitResult._make(self)._replace(**kwargs)
+
+    _replace = replace
+
+    def _asdict(self):
+        return dict(zip(self._fields, self))
+
+
+class BaseURL:
+    """A base url, parsed once, for resolving many relative urls against it.
+    This is much cheaper than calling urljoin for each link on a page.
+
+    base -- the (absolute) url that links are relative to.
+    """
+
+    __slots__ = ('base', '_parts', '_segments')
+
+    def __init__(self, base):
+        if isinstance(base, bytes):
+            base = from_bytes(base)
+        self.base = base
+        self._parts = _urlparse.urlparse(base)
+        self._segments = self._parts.path.split('/')[:-1]
+
+    def __repr__(self):
+        return f'BaseURL({self.base!r})'
+
+    def resolve(self, ref, split=False):
+        """Resolve the (possibly relative) url `ref` against the base, as urljoin would.
+        return -- the absolute url, or its yelp.uri.SplitResult if `split` is true.
+        """
+        if isinstance(ref, bytes):
+            ref = from_bytes(ref)
+        if not self.base or not ref:
+            url = ref or self.base
+        else:
+            url = _urlparse._urljoin(self._parts, self._segments, ref, True)
+        return urlsplit(url) if split else url
+
+    def resolve_many(self, refs, split=False):
+        """Resolve each of `refs`. See `resolve`.
+        return -- a list of absolute urls, or of SplitResults if `split` is true.
+        """
+        return [self.resolve(ref, split) for ref in refs]
+
+
 # List the names that this module "really" exports.
 __all__ = (
     'RFC3986',
     'netlocsplit',
     'netlocunsplit',
     'NetlocSplitResult',
+    'configure_interning',
+    'interning_info',
     'urlsplit',
+    'urlsplit_cache_info',
+    'clear_urlsplit_cache',
+    'configure_urlsplit_cache',
+    'urlsplit_many',
+    'SplitColumns',
+    'urlsplit_bytes',
+    'urlsplit_lazy',
+    'LazySplitResult',
+    'scheme_of',
+    'host_of',
+    'port_of',
+    'path_of',
+    'strip_fragment',
     'urlunsplit',
     'SplitResult',
+    'iter_qsl',
+    'QueryStringParser',
+    'QueryDict',
+    'BaseURL',
+    'remove_dot_segments',
+    'unquote_plus',
 )
@@ -0,0 +1,207 @@
+"""A small bounded least-recently-used mapping, shared by the caches in this package.
+
+The stdlib `functools.lru_cache` can't be resized, bounded by memory, or inspected
+for evictions, so we keep our own.
+
+The caches are safe to share between threads. Each one is guarded by a lock, which
+`StripedLRUCache` splits across several shards when many threads use a cache at once.
+"""
+import sys
+import threading
+from collections import namedtuple
+from collections import OrderedDict
+
+
+class CacheInfo(namedtuple('CacheInfo', 'hits misses evictions maxsize currsize maxbytes currbytes')):
+    """Statistics for an LRUCache. See also: functools.lru_cache().cache_info()"""
+
+    __slots__ = ()
+
+
+class LRUCache:
+    """A mapping that forgets its least-recently-used entries when it grows too large.
+
+    maxsize -- the maximum number of entries. None means unbounded; 0 disables caching.
+    maxbytes -- an optional bound on the total `sizeof(key, value)` of all entries.
+    sizeof -- weighs an entry against `maxbytes`. Only called when `maxbytes` is set.
+    """
+
+    stripes = 1
+
+    def __init__(self, maxsize=128, maxbytes=None, sizeof=None):
+        self._data = OrderedDict()  # key -> (value, size)
+        self._lock = threading.Lock()
+        self.sizeof = sizeof or _shallow_sizeof
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.currbytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        """Return the value for `key`, marking it as recently used, else `default`."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Store `value` under `key`, evicting old entries as needed to stay within bounds."""
+        if self.maxsize == 0:
+            return
+        size = 0 if self.maxbytes is None else self.sizeof(key, value)
+
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.currbytes -= old[1]
+            if self.maxbytes is not None and size > self.maxbytes:
+                # It would evict everything else, and still not fit. The old value is stale, so drop it too.
+                return
+            self._data[key] = (value, size)
+            self.currbytes += size
+            self._shrink()
+
+    def resize(self, maxsize, maxbytes=None):
+        """Change the bounds of the cache, evicting entries if it's now too large."""
+        with self._lock:
+            if (maxbytes is None) != (self.maxbytes is None):
+                # Entries are only weighed while there's a byte bound.
+                self._data = OrderedDict(
+                    (key, (value, 0 if maxbytes is None else self.sizeof(key, value)))
+                    for key, (value, _) in self._data.items()
+                )
+                self.currbytes = sum(size for _, size in self._data.values())
+            self.maxsize = maxsize
+            self.maxbytes = maxbytes
+            self._shrink()
+
+    def clear(self):
+        """Drop all entries and reset the statistics."""
+        with self._lock:
+            self._data.clear()
+            self.currbytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(
+                self.hits, self.misses, self.evictions,
+                self.maxsize, len(self._data),
+                self.maxbytes, self.currbytes,
+            )
+
+    def _shrink(self):
+        # The caller holds the lock.
+        data = self._data
+        while data and (
+                (self.maxsize is not None and len(data) > self.maxsize) or
+                (self.maxbytes is not None and self.currbytes > self.maxbytes)
+        ):
+            _, (_, size) = data.popitem(last=False)
+            self.currbytes -= size
+            self.evictions += 1
+
+
+class StripedLRUCache:
+    """An LRUCache split into `stripes` shards, each with its own lock, chosen by the hash of the key.
+    Threads using the cache at once rarely wait on each other, but since each shard holds
+    an equal share of the bounds, eviction is only approximately least-recently-used.
+    The shares add up to the bounds exactly, so a cache with fewer entries allowed than it
+    has stripes leaves some of its stripes empty.
+    """
+
+    def __init__(self, maxsize=128, maxbytes=None, sizeof=None, stripes=8):
+        if stripes < 1:
+            raise ValueError('A cache needs at least one stripe: %r' % (stripes,))
+        self._stripes = tuple(
+            LRUCache(_share(maxsize, stripes, index), _share(maxbytes, stripes, index), sizeof)
+            for index in range(stripes)
+        )
+        self.sizeof = self._stripes[0].sizeof
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+
+    @property
+    def stripes(self):
+        return len(self._stripes)
+
+    def _stripe(self, key):
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def __len__(self):
+        return sum(len(stripe) for stripe in self._stripes)
+
+    def __contains__(self, key):
+        return key in self._stripe(key)
+
+    def get(self, key, default=None):
+        """Return the value for `key`, marking it as recently used, else `default`."""
+        return self._stripe(key).get(key, default)
+
+    def put(self, key, value):
+        """Store `value` under `key`, evicting old entries of its stripe as needed to stay within bounds."""
+        self._stripe(key).put(key, value)
+
+    def resize(self, maxsize, maxbytes=None):
+        """Change the bounds of the cache, evicting entries if it's now too large."""
+        for index, stripe in enumerate(self._stripes):
+            stripe.resize(_share(maxsize, self.stripes, index), _share(maxbytes, self.stripes, index))
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+
+    def clear(self):
+        """Drop all entries and reset the statistics."""
+        for stripe in self._stripes:
+            stripe.clear()
+
+    def info(self):
+        infos = [stripe.info() for stripe in self._stripes]
+        return CacheInfo(
+            sum(info.hits for info in infos),
+            sum(info.misses for info in infos),
+            sum(info.evictions for info in infos),
+            self.maxsize,
+            sum(info.currsize for info in infos),
+            self.maxbytes,
+            sum(info.currbytes for info in infos),
+        )
+
+
+def reconfigure(cache, maxsize, maxbytes=None, stripes=1):
+    """Return `cache` with new bounds, or, if the number of stripes changes, a new empty cache
+    that weighs its entries the same way. The caller should replace `cache` with the result.
+    """
+    if stripes == cache.stripes:
+        cache.resize(maxsize, maxbytes)
+        return cache
+    elif stripes == 1:
+        return LRUCache(maxsize, maxbytes, cache.sizeof)
+    else:
+        return StripedLRUCache(maxsize, maxbytes, cache.sizeof, stripes)
+
+
+def _share(bound, stripes, index):
+    """The share of a bound held by the `index`th stripe of a cache. The shares add up to the bound."""
+    if bound is None:
+        return None
+    share, remainder = divmod(bound, stripes)
+    return share + (index < remainder)
+
+
+def parts_sizeof(url, parts):
+    """Approximate the memory held by a cache entry of a url and its parsed parts."""
+    return sys.getsizeof(url) + sum(sys.getsizeof(part) for part in parts if part is not None)
+
+
+def _shallow_sizeof(key, value):
+    return sys.getsizeof(key) + sys.getsizeof(value)
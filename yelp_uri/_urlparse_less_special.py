@@ -34,11 +34,16 @@ test_urlparse.py provides a good indicator of parsing behavior.
 """
 from collections import namedtuple
 
+from yelp_uri._lru import LRUCache
+from yelp_uri._lru import parts_sizeof
+from yelp_uri._lru import reconfigure
+
 
 # This is a stdlib file. To ease merging, we won't fix these style issues.
 
 __all__ = ["urlparse", "urlunparse", "urljoin", "urldefrag",
-           "urlsplit", "urlunsplit", "parse_qs", "parse_qsl"]
+           "urlsplit", "urlunsplit", "parse_qs", "parse_qsl",
+           "remove_dot_segments", "unquote", "unquote_plus"]
 
 # Characters valid in scheme names
 scheme_chars = ('abcdefghijklmnopqrstuvwxyz'
@@ -46,8 +51,23 @@ scheme_chars = ('abcdefghijklmnopqrstuvwxyz'
                 '0123456789'
                 '+-.')
 
-MAX_CACHE_SIZE = 20
-_parse_cache = {}
+# Frequently-seen schemes, in the forms we'll recognize without checking scheme_chars,
+# mapped to their lower-cased form.
+_known_schemes = {}
+for _scheme in ('http', 'https', 'mailto', 'tel', 'ftp', 'file', 'data', 'javascript', 'sms', 'ws', 'wss'):
+    for _form in (_scheme, _scheme.upper(), _scheme.capitalize()):
+        _known_schemes[_form] = _scheme
+del _scheme, _form
+
+MAX_CACHE_SIZE = 1024
+
+
+def _parse_cache_sizeof(key, value):
+    """Approximate the memory held by a parse-cache entry: the url plus its parts."""
+    return parts_sizeof(key[0], value)
+
+
+_parse_cache = LRUCache(MAX_CACHE_SIZE, sizeof=_parse_cache_sizeof)
 
 
 def clear_cache():
@@ -55,6 +75,21 @@ def clear_cache():
     _parse_cache.clear()
 
 
+def cache_info():
+    """Return a CacheInfo of the parse cache's hits, misses, evictions and size."""
+    return _parse_cache.info()
+
+
+def configure_cache(maxsize=MAX_CACHE_SIZE, maxbytes=None, stripes=1):
+    """Bound the parse cache to `maxsize` entries and, optionally, about `maxbytes` bytes of memory.
+    A `maxsize` of None means unbounded, and 0 disables the cache.
+    With more than one of `stripes`, threads contend less for the cache, but eviction is only
+    approximately least-recently-used, and the bounds are divided between the stripes, so
+    each holds a smaller share of them. Changing the number of stripes empties the cache."""
+    global _parse_cache
+    _parse_cache = reconfigure(_parse_cache, maxsize, maxbytes, stripes)
+
+
 class ResultMixin:
     """Shared methods for the parsed result objects."""
 
@@ -164,39 +199,33 @@ def urlsplit(url, scheme='', allow_fragments=True):
     cached = _parse_cache.get(key, None)
     if cached:
         return cached
-    if len(_parse_cache) >= MAX_CACHE_SIZE:  # avoid runaway growth
-        clear_cache()
-    netloc = None
-    query = fragment = ''
+    v = _urlsplit(url, scheme, allow_fragments)
+    _parse_cache.put(key, v)
+    return v
+
+
+def _urlsplit(url, scheme, allow_fragments):
+    """urlsplit, without the cache."""
     i = url.find(':')
     if i > 0:
-        if url[:i] == 'http':  # optimize the common case
-            scheme = url[:i].lower()
-            url = url[i + 1:]
-            if url[:2] == '//':
-                netloc, url = _splitnetloc(url, 2)
-            if allow_fragments and '#' in url:
-                url, fragment = url.split('#', 1)
-            if '?' in url:
-                url, query = url.split('?', 1)
-            v = SplitResult(scheme, netloc, url, query, fragment)
-            _parse_cache[key] = v
-            return v
-        for c in url[:i]:
-            if c not in scheme_chars:
-                break
-        else:
-            scheme, url = url[:i].lower(), url[i + 1:]
+        known_scheme = _known_schemes.get(url[:i])
+        if known_scheme is not None:  # optimize the common cases
+            return _splitafterscheme(known_scheme, url[i + 1:], allow_fragments)
+        if not url[:i].strip(scheme_chars):  # i.e. every character is a scheme character
+            return _splitafterscheme(url[:i].lower(), url[i + 1:], allow_fragments)
+    return _splitafterscheme(scheme, url, allow_fragments)
+
 
+def _splitafterscheme(scheme, url, allow_fragments):
+    netloc = None
+    query = fragment = ''
     if url[:2] == '//':
         netloc, url = _splitnetloc(url, 2)
     if allow_fragments and '#' in url:
         url, fragment = url.split('#', 1)
     if '?' in url:
         url, query = url.split('?', 1)
-    v = SplitResult(scheme, netloc, url, query, fragment)
-    _parse_cache[key] = v
-    return v
+    return SplitResult(scheme, netloc, url, query, fragment)
 
 
 def urlunparse(data):
@@ -237,8 +266,13 @@ def urljoin(base, url, allow_fragments=True):
         return url
     if not url:
         return base
-    bscheme, bnetloc, bpath, bparams, bquery, bfragment = \
-        urlparse(base, '', allow_fragments)
+    return _urljoin(urlparse(base, '', allow_fragments), None, url, allow_fragments)
+
+
+def _urljoin(bparts, bsegments, url, allow_fragments):
+    """urljoin, given the already-parsed base and, optionally, the
+    segments of its path up to its last slash."""
+    bscheme, bnetloc, bpath, bparams, bquery, bfragment = bparts
     scheme, netloc, path, params, query, fragment = \
         urlparse(url, bscheme, allow_fragments)
     if scheme != bscheme:
@@ -262,28 +296,72 @@ def urljoin(base, url, allow_fragments=True):
             query = bquery
         return urlunparse((scheme, netloc, path,
                            params, query, fragment))
-    segments = bpath.split('/')[:-1] + path.split('/')
+    if bsegments is None:
+        bsegments = bpath.split('/')[:-1]
+    segments = bsegments + path.split('/')
+    return urlunparse((scheme, netloc, _resolve_segments(segments),
+                       params, query, fragment))
+
+
+def _resolve_segments(segments):
+    """Collapse the '.' and '..' segments of a merged path, in one pass.
+    Unlike remove_dot_segments, this keeps the RFC 1808 behavior of stdlib urljoin,
+    where '..' segments above the root are kept."""
     # XXX The stuff below is bogus in various ways...
-    if segments[-1] == '.':
-        segments[-1] = ''
-    while '.' in segments:
-        segments.remove('.')
-    while 1:
-        i = 1
-        n = len(segments) - 1
-        while i < n:
-            if segments[i] == '..' and segments[i - 1] not in ('', '..'):
-                del segments[i - 1:i + 1]
-                break
-            i = i + 1
+    last = segments[-1]
+    if last == '.':
+        last = ''
+    resolved = []
+    for segment in segments[:-1]:
+        if segment == '.':
+            continue
+        if segment == '..' and resolved and resolved[-1] not in ('', '..'):
+            resolved.pop()
         else:
+            resolved.append(segment)
+    resolved.append(last)
+    if resolved == ['', '..']:
+        resolved[-1] = ''
+    elif len(resolved) >= 2 and resolved[-1] == '..':
+        resolved[-2:] = ['']
+    return '/'.join(resolved)
+
+
+def remove_dot_segments(path):
+    """Remove the '.' and '..' segments of a path, exactly as in RFC 3986, section 5.2.4.
+    This takes time linear in the length of the path.
+
+    remove_dot_segments('/a/b/c/./../../g') -> '/a/g'
+    """
+    if '.' not in path:
+        return path
+    output = []
+    i, end = 0, len(path)
+    while i < end:
+        if path.startswith('../', i):  # A
+            i += 3
+        elif path.startswith('./', i):  # A
+            i += 2
+        elif path.startswith('/./', i):  # B
+            i += 2
+        elif path.startswith('/../', i):  # C
+            i += 3
+            if output:
+                output.pop()
+        elif end - i <= 3 and path[i:] in ('/.', '/..'):  # B, C
+            if path[i:] == '/..' and output:
+                output.pop()
+            output.append('/')
             break
-    if segments == ['', '..']:
-        segments[-1] = ''
-    elif len(segments) >= 2 and segments[-1] == '..':
-        segments[-2:] = ['']
-    return urlunparse((scheme, netloc, '/'.join(segments),
-                       params, query, fragment))
+        elif end - i <= 2 and path[i:] in ('.', '..'):  # D
+            break
+        else:  # E
+            j = path.find('/', i + 1)
+            if j < 0:
+                j = end
+            output.append(path[i:j])
+            i = j
+    return ''.join(output)
 
 
 def urldefrag(url):
@@ -293,12 +371,18 @@ def urldefrag(url):
     the URL contained no fragments, the second element is the
     empty string.
     """
-    if '#' in url:
+    head, hash_, frag = url.partition('#')
+    if not hash_:
+        return url, ''
+    # The fragment always starts at the first '#', and urlunparse only changes the rest of the url
+    # when it lower-cases the scheme, or drops an empty query or params.
+    i = head.find(':')
+    if ';' in head or head[-1:] == '?' or (i > 0 and not head[:i].islower()):
         s, n, p, a, q, frag = urlparse(url)
         defrag = urlunparse((s, n, p, a, q, ''))
-        return defrag, frag
     else:
-        return url, ''
+        defrag = head
+    return defrag, frag
 
 # unquote method for parse_qs and parse_qsl
 # Cannot use directly from urllib as it would create circular reference.
@@ -311,6 +395,8 @@ _hextochr = {a + b: chr(int(a + b, 16)) for a in _hexdig for b in _hexdig}
 
 def unquote(s):
     """unquote('abc%20def') -> 'abc def'."""
+    if '%' not in s:
+        return s
     res = s.split('%')
     for i in range(1, len(res)):
         item = res[i]
@@ -318,11 +404,16 @@ def unquote(s):
             res[i] = _hextochr[item[:2]] + item[2:]
         except KeyError:
             res[i] = '%' + item
-        except UnicodeDecodeError:
-            res[i] = chr(int(item[:2], 16)) + item[2:]
     return "".join(res)
 
 
+def unquote_plus(s):
+    """unquote_plus('abc+def%21') -> 'abc def!'."""
+    if '+' in s:
+        s = s.replace('+', ' ')
+    return unquote(s)
+
+
 def parse_qs(qs, keep_blank_values=0, strict_parsing=0):
     """Parse a query given as a string argument.
 
@@ -389,3 +480,8 @@ def parse_qsl(qs, keep_blank_values=0, strict_parsing=0):
             r.append((name, value))
 
     return r
+
+
+def _iter_qs_fields(qs):
+    for s1 in qs.split('&'):
+        yield from s1.split(';')
@@ -0,0 +1,79 @@
+"""asyncio adapters for recoding uris and finding urls, which don't stall the event loop.
+
+Recoding is offloaded to an executor: by default the loop's own thread pool, though a
+concurrent.futures.ProcessPoolExecutor lets it run in parallel. Searching text stays on
+the loop, but gives it back between windows of the text:
+
+    >>> import asyncio
+    >>> from yelp_uri.aio import find_urls_async
+    >>> async def find(text):
+    ...     return [match.group() async for match in find_urls_async(text)]
+    >>> asyncio.run(find('See www.yelp.com or http://m.yelp.com/biz.'))
+    ['www.yelp.com', 'http://m.yelp.com/biz']
+"""
+import asyncio
+import re
+from itertools import islice
+
+from yelp_uri.encoding import _recode_chunk
+from yelp_uri.encoding import recode_uri
+from yelp_uri.search import url_regex
+
+SEARCH_WINDOW = 8192
+
+# The url and email patterns never match across ASCII whitespace.
+_whitespace = re.compile(r'[ \t\n\r\x0b\x0c]')
+
+
+async def recode_uri_async(uri, executor=None):
+    """recode_uri, in `executor`, or the loop's default executor if None."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, recode_uri, uri)
+
+
+async def recode_many_async(uris, executor=None, chunksize=100):
+    """recode_uri each of `uris` in `executor`, `chunksize` at a time, returning a list of the results in order.
+    If any uri is malformed, its MalformedUrlError is raised.
+    """
+    if chunksize < 1:
+        raise ValueError('chunksize must be at least 1: %r' % (chunksize,))
+    loop = asyncio.get_running_loop()
+    uris = iter(uris)
+    chunks = iter(lambda: list(islice(uris, chunksize)), [])
+    results = await asyncio.gather(*[
+        loop.run_in_executor(executor, _recode_chunk, chunk) for chunk in chunks
+    ])
+    return [uri for chunk in results for uri in chunk]
+
+
+async def find_urls_async(text, regex=url_regex, window=SEARCH_WINDOW):
+    """Asynchronously iterate over the matches of `regex` in `text`, as regex.finditer would,
+    returning control to the event loop after searching each `window` or so characters.
+
+    regex -- one of the patterns from yelp_uri.search, or another which can't match across
+        ASCII whitespace: windows end at whitespace, so that no match is cut in two.
+        A long stretch of text without any whitespace is searched all at once.
+    """
+    if window < 1:
+        raise ValueError('window must be at least 1: %r' % (window,))
+    pos, length = 0, len(text)
+    while pos < length:
+        end = pos + window
+        if end < length:
+            space = _whitespace.search(text, end)
+            end = space.start() if space else length
+        else:
+            end = length
+
+        for match in regex.finditer(text, pos, end):
+            yield match
+        pos = end
+        await asyncio.sleep(0)
+
+
+# List the names that this module "really" exports.
+__all__ = (
+    'recode_uri_async',
+    'recode_many_async',
+    'find_urls_async',
+)
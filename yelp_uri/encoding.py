@@ -3,8 +3,14 @@
 This is complicated since a uri consists of several parts with non-uniform encoding schemes.
 In general, hostnames should be punycode, usernames should be utf8, and everything else should be urlquote+utf8.
 """
+import functools
+import os
 import re
-import urllib.parse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from itertools import islice
 
 from yelp_bytes import from_bytes
 from yelp_bytes import to_bytes
@@ -14,6 +20,9 @@ from yelp_uri import RFC3986
 from yelp_uri import SplitResult
 from yelp_uri import urlsplit
 from yelp_uri import urlunsplit
+from yelp_uri._lru import LRUCache
+from yelp_uri._lru import reconfigure
+from yelp_uri._lru import StripedLRUCache
 
 
 def encode_uri(uri):
@@ -64,18 +73,247 @@ def decode_split_uri(uri):
 
 def recode_uri(uri):
     """Take an unknown uri and return a well-encoded uri suitable for an html href.
-    This is essentially equivalent to encode(decode(uri)), but a little more efficient.
+    This is equivalent to encode(decode(uri)), but more efficient.
+    A uri which is already well-encoded is returned as-is; see `is_well_encoded`.
     """
-    uri = urlsplit(uri)
+    split_uri = urlsplit(uri)
+    if isinstance(uri, str) and _is_well_encoded_split(uri, split_uri):
+        return uri
 
-    new_uri = recode_split_uri(uri)
+    new_uri = recode_split_uri(split_uri)
 
     return urlunsplit(new_uri)
 
 
+def is_well_encoded(uri):
+    """Return whether `uri` is already in the form that recode_uri would give it,
+    so that recode_uri(uri) == uri. This is much cheaper than recoding.
+    A few unusual uris may fail this check and yet recode to themselves.
+    """
+    if not isinstance(uri, str):
+        return False
+    try:
+        split_uri = urlsplit(uri)
+    except MalformedUrlError:
+        return False
+    return _is_well_encoded_split(uri, split_uri)
+
+
+def _is_well_encoded_split(uri, split_uri):
+    if urlunsplit(split_uri) != uri:
+        # Splitting normalizes the uri, e.g. the case of the scheme, or a leading zero in the port.
+        return False
+    scheme, username, password, hostname, _, path, query, fragment = split_uri
+    return (
+        not scheme.translate(_quoting_table('')[0]) and
+        _is_well_encoded_hostname(hostname) and
+        _is_well_encoded_component(path, RFC3986.path) and
+        _is_well_encoded_component(query, RFC3986.query) and
+        _is_well_encoded_component(fragment, RFC3986.fragment) and
+        _is_well_encoded_component(username, RFC3986.userinfo) and
+        _is_well_encoded_component(password, RFC3986.userinfo)
+    )
+
+
+def _is_well_encoded_component(string, expected):
+    """Whether _recode(string, expected) == string."""
+    if string is None:
+        return True
+    if string.translate(_quoting_table(expected)[0]):
+        return False  # Something to quote, or not ASCII.
+    if '%' not in string:
+        return True
+
+    escaped_utf8 = False
+    for item in string.split('%')[1:]:
+        escape = item[:2]
+        byte = _unquoted_escapes.get(escape)
+        if byte is None:
+            continue  # Left as it is, like a '%' that's not an escape.
+        if byte < 0x80 or escape != _quoted_escapes[byte]:
+            return False  # Plaintext is unquoted, and other escapes are upper-cased.
+        escaped_utf8 = True
+
+    if escaped_utf8:
+        # Non-UTF-8 bytes are transcoded.
+        try:
+            _unquote_bytes(string.encode('ASCII')).decode('UTF-8')
+        except UnicodeDecodeError:
+            return False
+    return True
+
+
+def _is_well_encoded_hostname(hostname):
+    """Whether _encode_hostname(_decode_hostname(hostname)) == hostname."""
+    if not hostname:
+        return True
+    if hostname.translate(_unexpected_in_hostname):
+        return False
+    if hostname[0] == '.' or hostname[-1] == '.' or '..' in hostname:
+        return False  # Bad dots are fixed up.
+    if 'xn--' in hostname:
+        # Punycode might not decode, or might encode back differently. Check, using the cache.
+        try:
+            return _encode_hostname(_decode_hostname(hostname)) == hostname
+        except UnicodeError:
+            return False
+    # Otherwise, the IDNA codec leaves ASCII hostnames alone, unless a label is too long.
+    return all(len(label) < 64 for label in hostname.split('.'))
+
+
 def recode_split_uri(uri):
-    """uri -- a yelp.uri.SplitResult object"""
-    return encode_split_uri(decode_split_uri(uri))
+    """uri -- a yelp.uri.SplitResult object
+    This gives the same result as encode_split_uri(decode_split_uri(uri)), without the decoded SplitResult.
+    """
+    scheme = _recode(uri.scheme)
+    username = _recode(uri.username, expected=RFC3986.userinfo)
+    password = _recode(uri.password, expected=RFC3986.userinfo)
+    hostname = _decode_hostname(uri.hostname)
+    port = _decode(uri.port, encoding='ASCII')
+    path = _recode(uri.path, expected=RFC3986.path)
+    query = _recode(uri.query, expected=RFC3986.query)
+    fragment = _recode(uri.fragment, expected=RFC3986.fragment)
+    # Only the hostname and port can fail to encode. Do them last, so that a uri with several
+    # problems raises the same error as encode(decode()), where all of the decoding comes first.
+    return SplitResult(
+        scheme,
+        username,
+        password,
+        _encode_hostname(hostname),
+        _encode(port, encoding='ASCII', expected=RFC3986.digits),
+        path,
+        query,
+        fragment,
+    )
+
+
+def recode_many(uris, max_workers=None):
+    """recode_uri each of `uris` on a pool of threads, returning a list of the results in order.
+    This only beats a plain loop where threads run python in parallel, as on free-threaded builds.
+    If any uri is malformed, its MalformedUrlError is raised.
+
+    max_workers -- the number of threads; by default, as for concurrent.futures.ThreadPoolExecutor.
+    """
+    uris = list(uris)
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) + 4)
+    # Hand the threads a few chunks each, rather than paying for a future per uri.
+    size = -(-len(uris) // (max_workers * 4)) or 1
+    with ThreadPoolExecutor(max_workers) as executor:
+        chunks = executor.map(_recode_chunk, [uris[i:i + size] for i in range(0, len(uris), size)])
+        return [uri for chunk in chunks for uri in chunk]
+
+
+def _recode_chunk(uris):
+    return [recode_uri(uri) for uri in uris]
+
+
+def recode_uri_many(uris, workers=None, chunksize=1000):
+    """recode_uri each of `uris` in a pool of processes, yielding the results in order.
+    A uri which is malformed yields its MalformedUrlError, rather than ending the batch.
+
+    workers -- the number of processes; by default, one per cpu.
+    chunksize -- the number of uris sent to a process at a time.
+        If there's only one chunk, or one worker, the uris are recoded in this process instead.
+    """
+    return _map_many(recode_uri, uris, workers, chunksize)
+
+
+def decode_uri_many(uris, workers=None, chunksize=1000):
+    """decode_uri each of `uris` in a pool of processes. See `recode_uri_many`."""
+    return _map_many(decode_uri, uris, workers, chunksize)
+
+
+def encode_uri_many(uris, workers=None, chunksize=1000):
+    """encode_uri each of `uris` in a pool of processes. See `recode_uri_many`."""
+    return _map_many(encode_uri, uris, workers, chunksize)
+
+
+def _map_many(func, uris, workers, chunksize):
+    if chunksize < 1:
+        raise ValueError('chunksize must be at least 1: %r' % (chunksize,))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    elif workers < 1:
+        raise ValueError('workers must be at least 1: %r' % (workers,))
+    return _map_chunks(func, _chunks(uris, chunksize), workers)
+
+
+def _map_chunks(func, chunks, workers):
+    first = next(chunks, [])
+    second = next(chunks, None)
+    if second is None or workers == 1:
+        # Not worth starting processes for.
+        for chunk in chain((first,), () if second is None else (second,), chunks):
+            yield from _apply_chunk(func, chunk)
+        return
+
+    with ProcessPoolExecutor(workers) as pool:
+        # Keep every worker busy, without reading the whole input ahead of the results.
+        pending = deque()
+        try:
+            for chunk in chain((first, second), chunks):
+                pending.append(pool.submit(_apply_chunk, func, chunk))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _apply_chunk(func, uris):
+    results = []
+    for uri in uris:
+        try:
+            result = func(uri)
+        except MalformedUrlError as error:
+            result = error
+        results.append(result)
+    return results
+
+
+URI_CACHE_SIZE = 1024
+
+
+def memoize_uri(maxsize=URI_CACHE_SIZE, stripes=1):
+    """Decorate a function of a single uri, like recode_uri, to remember its results in a bounded LRU cache.
+    A MalformedUrlError is remembered too, and raised again for the same uri.
+    Like functools.lru_cache, the decorated function has `cache_info()` and `cache_clear()`.
+
+    maxsize, stripes -- see yelp_uri.configure_urlsplit_cache
+    """
+    def decorator(func):
+        cache = LRUCache(maxsize) if stripes == 1 else StripedLRUCache(maxsize, stripes=stripes)
+
+        @functools.wraps(func)
+        def memoized(uri):
+            try:
+                hash(uri)
+            except TypeError:  # Can't be a cache key, like a bytearray.
+                return func(uri)
+            # Key on the type too, so that str and bytes uris never share an entry.
+            return _call_cached(cache, (type(uri), uri), func, uri, MalformedUrlError)
+
+        memoized.cache_info = cache.info
+        memoized.cache_clear = cache.clear
+        return memoized
+    return decorator
+
+
+# Opt-in memoized versions, for programs which see the same few uris over and over.
+recode_uri_cached = memoize_uri()(recode_uri)
+decode_uri_cached = memoize_uri()(decode_uri)
 
 
 def encode_email(email):
@@ -143,24 +381,138 @@ def recode_split_email(email):
 def _encode(string, encoding='UTF-8', expected='', quoted=True):
     if string is None:
         return string
-    string = from_bytes(string)
+    if type(string) is not str:
+        string = from_bytes(string)
 
     if encoding:
-        string = string.encode(encoding)
         if quoted:
-            string = urllib.parse.quote(string, expected)
+            unsafe, quoted_bytes = _quoting_table(expected)
+            if not string.translate(unsafe):
+                # Nothing to quote, and ASCII encodes to itself.
+                return string
+            string = ''.join([quoted_bytes[byte] for byte in string.encode(encoding)])
         else:
-            string = string.decode('ASCII')
+            string = string.encode(encoding).decode('ASCII')
 
     return string
 
 
+def _recode(string, expected=''):
+    """Equivalent to _encode(_decode(string), expected=expected), but in one pass over the bytes,
+    without decoding them unless they're neither ASCII nor UTF-8.
+    """
+    if string is None:
+        return string
+    if type(string) is str and string.isascii():
+        if '%' not in string:
+            # Decoding would give back the same string.
+            return _encode(string, expected=expected)
+        string = string.encode('ASCII')
+    else:
+        string = to_bytes(string)
+
+    string = _unquote_bytes(string)
+    if string.isascii():
+        return _encode(string.decode('ASCII'), expected=expected)
+    try:
+        string.decode('UTF-8')
+    except UnicodeDecodeError:
+        # The internet codec falls back to cp1252 or latin-1, which we then encode as UTF-8.
+        string = string.decode('internet').encode('UTF-8')
+    unsafe, quoted_bytes = _quoting_table(expected)
+    return ''.join([quoted_bytes[byte] for byte in string])
+
+
+# The characters which urllib.parse.quote never quotes.
+_always_safe = RFC3986.alphanum + '_.-~'
+_quoting_tables = {}
+
+
+def _quoting_table(expected):
+    """Return the quoting tables for the characters `expected` in a component, as quote(string, expected) would:
+    a str.translate table which removes all the characters that don't need quoting,
+    and a list of the quoted form of each byte.
+    """
+    table = _quoting_tables.get(expected)
+    if table is None:
+        safe = _always_safe + expected
+        table = _quoting_tables[expected] = (
+            str.maketrans('', '', safe),
+            [chr(byte) if chr(byte) in safe else '%%%02X' % byte for byte in range(256)],
+        )
+    return table
+
+
+# Build the tables for each component up front.
+for _expected in ('', RFC3986.userinfo, RFC3986.digits, RFC3986.path, RFC3986.query, RFC3986.fragment):
+    _quoting_table(_expected)
+del _expected
+
+
+HOSTNAME_CACHE_SIZE = 4096
+
+# Maps (True, hostname) to its encoding and (False, hostname) to its decoding, as a (result, error) pair.
+# error is None or the (type, args) of the UnicodeError that the hostname raised.
+_hostname_cache = LRUCache(HOSTNAME_CACHE_SIZE)
+
+
+def hostname_cache_info():
+    """Return a CacheInfo of the hostname cache's hits, misses, evictions and size.
+    The cache holds both directions: unicode to punycode, and punycode to unicode.
+    """
+    return _hostname_cache.info()
+
+
+def clear_hostname_cache():
+    """Empty the hostname cache and reset its statistics."""
+    _hostname_cache.clear()
+
+
+def configure_hostname_cache(maxsize=HOSTNAME_CACHE_SIZE, stripes=1):
+    """Bound the hostname cache to `maxsize` entries. A `maxsize` of None means unbounded, and 0 disables the cache.
+    See also: yelp_uri.configure_urlsplit_cache
+    """
+    global _hostname_cache
+    _hostname_cache = reconfigure(_hostname_cache, maxsize, None, stripes)
+
+
+def _cached_hostname(encode, hostname, uncached):
+    if not isinstance(hostname, (str, bytes)):
+        return uncached(hostname)
+
+    return _call_cached(_hostname_cache, (encode, hostname), uncached, hostname, UnicodeError)
+
+
+def _call_cached(cache, key, func, arg, errors):
+    """Return func(arg), or its result from `cache` under `key`.
+    Exceptions of the `errors` types are cached too, as their (type, args), and raised again.
+    """
+    entry = cache.get(key)
+    if entry is None:
+        try:
+            result = func(arg)
+        except errors as error:
+            cache.put(key, (None, (type(error), error.args)))
+            raise
+        cache.put(key, (result, None))
+        return result
+
+    result, error = entry
+    if error is not None:
+        error_type, args = error
+        raise error_type(*args)
+    return result
+
+
 def _encode_hostname(hostname):
-    # Fix-up bad leading/trailing/consecutive dots in the domain
-    # -- prior art in chromium browser.
     if hostname is None:
         return hostname
+    return _cached_hostname(True, hostname, _encode_hostname_uncached)
+
 
+def _encode_hostname_uncached(hostname):
+    # Fix-up bad leading/trailing/consecutive dots in the domain
+    # -- prior art in chromium browser.
     hostname = hostname.strip('.')
     hostname = _extra_dots_RE.sub('.', hostname)
     try:
@@ -175,10 +527,13 @@ def _encode_hostname(hostname):
 
 
 def _decode_hostname(hostname):
-    # IDNA decoding is not idempotent (sadface) so we need a special case here.
     if hostname is None:
         return hostname
+    return _cached_hostname(False, hostname, _decode_hostname_uncached)
 
+
+def _decode_hostname_uncached(hostname):
+    # IDNA decoding is not idempotent (sadface) so we need a special case here.
     hostname = to_bytes(hostname)
     hostname = _unquote_bytes(hostname)
     if _is_punycoded(hostname):
@@ -203,26 +558,45 @@ def _unquote_bytes(string):
     """Similar to urllib.unquote, but only unquote ASCII-plaintext and non-ASCII bytes (0x80-0xFF).
     This is only for use by _decode(), above.
     """
+    if b'%' not in string:
+        return string
 
     res = string.split(b'%')
+    unquoted = _unquoted_bytes.get
     for i in range(1, len(res)):
         item = res[i]
-        try:
-            c = int(item[:2], 16)
-        except ValueError:
+        char = unquoted(item[:2])
+        if char is None:
             res[i] = b'%' + item
         else:
-            char = bytes((c,))
-            if (
-                    c >= 0x80 or
-                    char in _ascii_plaintext
-            ):
-                res[i] = char + item[2:]
-            else:
-                res[i] = b'%' + item
+            res[i] = char + item[2:]
     return b''.join(res)
 
 
+def _hex_spellings(byte):
+    """All the ways to write `byte` as two hex digits: b'4A', b'4a', ..."""
+    high, low = b'%02X' % byte
+    return {
+        bytes((high_case, low_case))
+        for high_case in {high, ord(chr(high).lower())}
+        for low_case in {low, ord(chr(low).lower())}
+    }
+
+
+# Maps each escape that _unquote_bytes should unquote, without the '%', to its byte.
+_unquoted_bytes = {
+    spelling: bytes((byte,))
+    for byte in range(256)
+    if byte >= 0x80 or bytes((byte,)) in _ascii_plaintext
+    for spelling in _hex_spellings(byte)
+}
+
+
+# The same escapes, as str, mapped to their byte values, and the canonical escape of each byte.
+_unquoted_escapes = {spelling.decode('ASCII'): byte[0] for spelling, byte in _unquoted_bytes.items()}
+_quoted_escapes = ['%02X' % byte for byte in range(256)]
+_unexpected_in_hostname = str.maketrans('', '', RFC3986.alphanum + '-.')
+
 _extra_dots_RE = re.compile(r'\.\.+')
 
 
@@ -0,0 +1,243 @@
+"""Parse query strings and form bodies lazily, or incrementally, rather than all at once.
+
+parse_qs and parse_qsl, from yelp_uri._urlparse_less_special, build every (name, value) pair up front.
+Here, `iter_qsl` yields them one at a time, `QueryStringParser` parses a body as it arrives in chunks,
+and `QueryDict` only unquotes the values which are read:
+
+    >>> from yelp_uri.query import QueryDict
+    >>> query = QueryDict('q=pizza&loc=San+Francisco&loc=Oakland')
+    >>> query['loc'], query.getlist('loc')
+    ('San Francisco', ['San Francisco', 'Oakland'])
+"""
+import codecs
+from urllib.parse import quote_plus
+
+from yelp_uri._urlparse_less_special import _iter_qs_fields
+from yelp_uri._urlparse_less_special import unquote_plus
+
+
+def iter_qsl(qs, keep_blank_values=0, strict_parsing=0):
+    """Like parse_qsl, but yield the (name, value) pairs one at a time,
+    without building a list of the query's fields first."""
+    for name_value in _iter_qs_fields(qs):
+        if not name_value and not strict_parsing:
+            continue
+        nv = name_value.split('=', 1)
+        if len(nv) != 2:
+            if strict_parsing:
+                raise ValueError(f"bad query field: {name_value!r}")
+            # Handle case of a control-name with no equal sign
+            if keep_blank_values:
+                nv.append('')
+            else:
+                continue
+        if len(nv[1]) or keep_blank_values:
+            yield unquote_plus(nv[0]), unquote_plus(nv[1])
+
+
+class QueryStringParser:
+    """Incrementally parse an application/x-www-form-urlencoded body, as it arrives in chunks.
+    Fields may be split across chunks, which may be str, or bytes in `encoding`.
+
+    keep_blank_values, strict_parsing: as in parse_qsl.
+    max_fields: if given, raise ValueError once the body has more than this many fields.
+    max_field_length: if given, raise ValueError for any name=value field longer than this
+        many characters, before buffering any more of it.
+    encoding, errors: how to decode bytes chunks, as in bytes.decode.
+    """
+
+    def __init__(self, keep_blank_values=0, strict_parsing=0,
+                 max_fields=None, max_field_length=None,
+                 encoding='utf-8', errors='replace'):
+        self.keep_blank_values = keep_blank_values
+        self.strict_parsing = strict_parsing
+        self.max_fields = max_fields
+        self.max_field_length = max_field_length
+        self.fields = 0
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors)
+        self._partial = []  # The pieces of the field that's still arriving.
+        self._partial_length = 0
+
+    def feed(self, chunk):
+        """Parse the next chunk of the body.
+        Returns a list of the (name, value) pairs completed by this chunk."""
+        if isinstance(chunk, bytes):
+            chunk = self._decoder.decode(chunk)
+        # Only search the new chunk: the buffered pieces have no separators.
+        last = max(chunk.rfind('&'), chunk.rfind(';'))
+        if last < 0:
+            self._partial.append(chunk)
+            self._partial_length += len(chunk)
+            self._check_length(self._partial_length, self._partial[0])
+            return []
+        self._partial.append(chunk[:last])
+        data = ''.join(self._partial)
+        rest = chunk[last + 1:]
+        self._partial = [rest]
+        self._partial_length = len(rest)
+        self._check_length(len(rest), rest)
+        return self._parse(data)
+
+    def close(self):
+        """Signal the end of the body.
+        Returns a list of the (name, value) pairs in its last field."""
+        self._partial.append(self._decoder.decode(b'', final=True))
+        data = ''.join(self._partial)
+        self._partial = []
+        self._partial_length = 0
+        return self._parse(data)
+
+    def _parse(self, qs):
+        if self.max_field_length is not None:
+            for name_value in _iter_qs_fields(qs):
+                self._check_length(len(name_value), name_value)
+        result = []
+        for nv in iter_qsl(qs, self.keep_blank_values, self.strict_parsing):
+            self.fields += 1
+            if self.max_fields is not None and self.fields > self.max_fields:
+                raise ValueError(f"too many query fields: more than {self.max_fields}")
+            result.append(nv)
+        return result
+
+    def _check_length(self, length, name_value):
+        if self.max_field_length is not None and length > self.max_field_length:
+            raise ValueError(f"query field too long: {name_value[:20]!r}...")
+
+
+class QueryDict:
+    """An ordered, multi-valued mapping of a parsed query string.
+
+    Unlike parse_qs, this keeps each field's raw text and only unquotes a value
+    when it's read. Lookups by name are O(1), and urlencode() reuses the raw
+    text of the fields that haven't been changed.
+    get() and [] give the first value for a name; getlist() gives them all.
+
+    qs, keep_blank_values: as in parse_qs.
+    """
+
+    __slots__ = ('_raw', '_names', '_values', '_index')
+
+    def __init__(self, qs='', keep_blank_values=0):
+        self._raw = []  # Each field's name=value text, or None once it's been set.
+        self._names = []  # Each field's unquoted name, or None once it's been deleted.
+        self._values = []  # Each field's unquoted value, or None until it's been read.
+        self._index = {}  # name -> the position of its only field, or a list of positions.
+        for name_value in _iter_qs_fields(qs):
+            name, _, value = name_value.partition('=')
+            if value or (name_value and keep_blank_values):
+                self._append(unquote_plus(name), name_value, None)
+
+    def _append(self, name, raw, value):
+        position = len(self._names)
+        self._raw.append(raw)
+        self._names.append(name)
+        self._values.append(value)
+        positions = self._index.get(name)
+        if positions is None:
+            self._index[name] = position
+        elif type(positions) is int:
+            self._index[name] = [positions, position]
+        else:
+            positions.append(position)
+
+    def _positions(self, name):
+        positions = self._index[name]
+        return (positions,) if type(positions) is int else positions
+
+    def _value(self, position):
+        value = self._values[position]
+        if value is None:
+            value = self._raw[position].partition('=')[2]
+            value = self._values[position] = unquote_plus(value)
+        return value
+
+    def __getitem__(self, name):
+        return self._value(self._positions(name)[0])
+
+    def get(self, name, default=None):
+        if name in self._index:
+            return self[name]
+        return default
+
+    def getlist(self, name):
+        if name in self._index:
+            return [self._value(position) for position in self._positions(name)]
+        return []
+
+    def __setitem__(self, name, value):
+        """Set the only value for `name`, in place of its first field if it already has one."""
+        if name not in self._index:
+            self._append(name, None, value)
+            return
+        first, *rest = self._positions(name)
+        for position in rest:
+            self._names[position] = self._values[position] = None
+        self._raw[first] = None
+        self._values[first] = value
+        self._index[name] = first
+
+    def appendlist(self, name, value):
+        self._append(name, None, value)
+
+    def __delitem__(self, name):
+        for position in self._positions(name):
+            self._names[position] = self._values[position] = None
+        del self._index[name]
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def keys(self):
+        return self._index.keys()
+
+    def items(self):
+        """(name, first value) for each name."""
+        return [(name, self[name]) for name in self._index]
+
+    def lists(self):
+        """(name, all values) for each name."""
+        return [(name, self.getlist(name)) for name in self._index]
+
+    def pairs(self):
+        """Every (name, value) field, in order, as parse_qsl would return them."""
+        return [
+            (name, self._value(position))
+            for position, name in enumerate(self._names)
+            if name is not None
+        ]
+
+    def urlencode(self):
+        """Re-serialize the query. Unchanged fields are kept exactly as they were."""
+        fields = []
+        for position, name in enumerate(self._names):
+            if name is None:
+                continue
+            raw = self._raw[position]
+            if raw is None:
+                raw = quote_plus(name) + '=' + quote_plus(self._values[position])
+            fields.append(raw)
+        return '&'.join(fields)
+
+    def __eq__(self, other):
+        if isinstance(other, QueryDict):
+            return self.pairs() == other.pairs()
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'QueryDict({self.urlencode()!r})'
+
+
+# List the names that this module "really" exports.
+__all__ = (
+    'iter_qsl',
+    'QueryStringParser',
+    'QueryDict',
+)
@@ -0,0 +1,130 @@
+"""Lazily process the urls in large files, such as access logs, with constant memory.
+
+Each stage is a generator, so they can be chained with each other and with filtering or
+aggregation steps without building intermediate lists:
+
+    >>> from yelp_uri.stream import field, iter_urls, split_urls
+    >>> from collections import Counter
+    >>> hosts = Counter(  # doctest: +SKIP
+    ...     split.hostname for split in split_urls(iter_urls('access.log', field(6)))
+    ... )
+"""
+import io
+import mmap
+import os
+import stat
+
+from yelp_uri import MalformedUrlError
+from yelp_uri import urlsplit
+from yelp_uri.encoding import recode_uri
+
+
+def iter_lines(source):
+    """Yield each line of `source` as bytes, without its line ending.
+
+    source -- a path, or a file object, read from its current position. Regular files on disk
+        are memory-mapped; other file objects, such as pipes and gzip files, are iterated,
+        and text-mode files yield str lines.
+    """
+    if isinstance(source, (str, bytes, os.PathLike)):
+        with open(source, 'rb') as source:
+            yield from iter_lines(source)
+        return
+
+    if isinstance(source, io.TextIOBase):
+        for line in source:
+            yield line.rstrip('\r\n')
+        return
+
+    mapped = _map(source)
+    if mapped is None:
+        for line in source:
+            yield line.rstrip(b'\r\n')
+        return
+
+    with mapped:
+        start, end = source.tell(), len(mapped)
+        while start < end:
+            newline = mapped.find(b'\n', start)
+            if newline < 0:
+                newline = end
+            line = mapped[start:newline]
+            start = newline + 1
+            yield line[:-1] if line.endswith(b'\r') else line
+
+
+def _map(fileobj):
+    """Memory-map `fileobj`, or return None if it isn't a regular file on disk.
+    Other objects may have a fileno() too: a gzip file's is that of the compressed file.
+    """
+    raw = fileobj.raw if isinstance(fileobj, io.BufferedReader) else fileobj
+    if not isinstance(raw, io.FileIO):
+        return None
+    fd = fileobj.fileno()
+    if not stat.S_ISREG(os.fstat(fd).st_mode):
+        return None
+    try:
+        return mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):  # An empty file can't be mapped, nor can files on some filesystems.
+        return None
+
+
+def field(index, sep=None):
+    """Return an extractor for `iter_urls` that picks the `index`th (zero-based) field of a line.
+    Fields are separated by `sep`, or by runs of whitespace by default.
+    Lines with too few fields are skipped.
+    """
+    def extract(line):
+        fields = line.split(sep, index + 1)
+        if len(fields) > index:
+            return fields[index]
+        return None
+    return extract
+
+
+def iter_urls(source, extract=None):
+    """Yield the url found in each line of `source`. See `iter_lines`.
+
+    extract -- a callable that finds the url in a line, returning None to skip the line.
+        By default, each (non-empty) line is a url. See also: `field`.
+    """
+    for line in iter_lines(source):
+        url = line if extract is None else extract(line)
+        if url:
+            yield url
+
+
+def split_urls(urls, split=urlsplit, skip_malformed=False):
+    """Yield the split of each url in `urls`.
+
+    split -- the splitting function, such as yelp_uri.urlsplit_bytes or urlsplit_lazy.
+    skip_malformed -- if true, urls which raise MalformedUrlError are dropped, rather than
+        ending the stream.
+    """
+    return _map_urls(split, urls, skip_malformed)
+
+
+def recode_urls(urls, skip_malformed=False):
+    """Yield the well-encoded version of each url in `urls`. See yelp_uri.encoding.recode_uri."""
+    return _map_urls(recode_uri, urls, skip_malformed)
+
+
+def _map_urls(func, urls, skip_malformed):
+    for url in urls:
+        try:
+            result = func(url)
+        except MalformedUrlError:
+            if skip_malformed:
+                continue
+            raise
+        yield result
+
+
+# List the names that this module "really" exports.
+__all__ = (
+    'iter_lines',
+    'field',
+    'iter_urls',
+    'split_urls',
+    'recode_urls',
+)
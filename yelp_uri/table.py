@@ -0,0 +1,199 @@
+"""Store many split urls compactly, column by column.
+
+A list of SplitResults costs several hundred bytes per url, mostly in object headers.
+A URLTable keeps the same information in a handful of arrays:
+
+  * schemes and hostnames are dictionary-encoded, as an integer id per url;
+  * ports are packed into an array of 64-bit integers (larger ports raise OverflowError);
+  * the other components are UTF-8 encoded into one shared buffer, with their end offsets.
+
+    >>> from yelp_uri import urlsplit
+    >>> from yelp_uri.table import URLTable
+    >>> table = URLTable(urlsplit(url) for url in ('http://yelp.com/biz', 'http://yelp.com/search?q=1'))
+    >>> table[1].path, table[1].query
+    ('/search', 'q=1')
+    >>> [split.path for split in table.filter_hostname(table.hostname_id('yelp.com'))]
+    ['/biz', '/search']
+"""
+import sys
+from array import array
+
+from yelp_uri import SplitResult
+
+# Flags for the components which are None, rather than empty.
+_NO_USERNAME = 1
+_NO_PASSWORD = 2
+_NO_PORT = 4
+
+# The components kept in the text buffer, in order.
+_TEXT_FIELDS = 5
+
+
+class URLTable:
+    """A compact, append-only sequence of split urls. See the module docstring.
+
+    splits -- an optional iterable of yelp_uri.SplitResults (or equivalent 8-tuples) to start with.
+    """
+
+    __slots__ = (
+        '_schemes', '_scheme_ids', '_scheme_column',
+        '_hostnames', '_hostname_ids', '_hostname_column',
+        '_ports', '_nulls', '_buffer', '_ends',
+    )
+
+    def __init__(self, splits=()):
+        self._schemes = []  # id -> scheme
+        self._scheme_ids = {}  # scheme -> id
+        self._scheme_column = array('I')
+        self._hostnames = []  # id -> hostname, which may be None
+        self._hostname_ids = {}  # hostname -> id
+        self._hostname_column = array('I')
+        self._ports = array('q')
+        self._nulls = array('B')
+        # username, password, path, query and fragment of each url, UTF-8 encoded.
+        self._buffer = array('B')
+        self._ends = array('Q')  # _TEXT_FIELDS end offsets into _buffer per url
+        self.extend(splits)
+
+    def __len__(self):
+        return len(self._nulls)
+
+    def __repr__(self):
+        return f'<URLTable of {len(self)} urls>'
+
+    def append(self, split):
+        """Add a split url, such as a yelp_uri.SplitResult, to the end of the table."""
+        scheme, username, password, hostname, port, path, query, fragment = split
+
+        nulls = 0
+        if username is None:
+            nulls |= _NO_USERNAME
+            username = ''
+        if password is None:
+            nulls |= _NO_PASSWORD
+            password = ''
+        if port is None:
+            nulls |= _NO_PORT
+            port = 0
+        encoded = [
+            text.encode('UTF-8', 'surrogatepass')
+            for text in (username, password, path, query, fragment)
+        ]
+        # The text is encoded above, and the port is validated by appending it, before any other
+        # column is appended to: so if either fails, the table is left unchanged.
+        self._ports.append(port)
+
+        self._scheme_column.append(_encode_value(self._scheme_ids, self._schemes, scheme))
+        self._hostname_column.append(_encode_value(self._hostname_ids, self._hostnames, hostname))
+        self._nulls.append(nulls)
+        buffer, ends = self._buffer, self._ends
+        for text in encoded:
+            buffer.frombytes(text)
+            ends.append(len(buffer))
+
+    def extend(self, splits):
+        """Add each of `splits` to the end of the table."""
+        for split in splits:
+            self.append(split)
+
+    def __getitem__(self, index):
+        """Return the `index`th url, as a yelp_uri.SplitResult."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('URLTable index out of range')
+        return self._row(index)
+
+    def __iter__(self):
+        return map(self._row, range(len(self)))
+
+    def _row(self, index):
+        ends = self._ends
+        first = index * _TEXT_FIELDS
+        start = ends[first - 1] if index else 0
+        bounds = ends[first:first + _TEXT_FIELDS]
+
+        text = self._buffer[start:bounds[-1]].tobytes().decode('UTF-8', 'surrogatepass')
+        if len(text) == bounds[-1] - start:
+            # All ASCII, so we can slice the characters by the byte offsets.
+            texts = _slice(text, start, bounds)
+        else:
+            texts = [
+                self._buffer[begin:end].tobytes().decode('UTF-8', 'surrogatepass')
+                for begin, end in zip((start,) + tuple(bounds[:-1]), bounds)
+            ]
+        username, password, path, query, fragment = texts
+
+        nulls = self._nulls[index]
+        return SplitResult(
+            self._schemes[self._scheme_column[index]],
+            None if nulls & _NO_USERNAME else username,
+            None if nulls & _NO_PASSWORD else password,
+            self._hostnames[self._hostname_column[index]],
+            None if nulls & _NO_PORT else self._ports[index],
+            path,
+            query,
+            fragment,
+        )
+
+    @property
+    def hostnames(self):
+        """All the distinct hostnames in the table, indexed by their id."""
+        return tuple(self._hostnames)
+
+    def hostname_id(self, hostname):
+        """Return the id of `hostname` in this table. KeyError if no url has that hostname."""
+        return self._hostname_ids[hostname]
+
+    def filter_hostname(self, hostname_id):
+        """Yield the urls (as SplitResults) whose hostname has the id `hostname_id`."""
+        row = self._row
+        for index, row_hostname_id in enumerate(self._hostname_column):
+            if row_hostname_id == hostname_id:
+                yield row(index)
+
+    def memory_usage(self):
+        """Return a dict of the approximate number of bytes used by each part of the table,
+        with the sum under 'total'. sys.getsizeof(table) also counts the table object itself.
+        """
+        usage = {
+            'schemes': sys.getsizeof(self._scheme_column) + _dictionary_sizeof(self._scheme_ids, self._schemes),
+            'hostnames': sys.getsizeof(self._hostname_column) + _dictionary_sizeof(self._hostname_ids, self._hostnames),
+            'ports': sys.getsizeof(self._ports) + sys.getsizeof(self._nulls),
+            'text': sys.getsizeof(self._buffer) + sys.getsizeof(self._ends),
+        }
+        usage['total'] = sum(usage.values())
+        return usage
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + self.memory_usage()['total']
+
+
+def _encode_value(ids, values, value):
+    """Return the id of `value` in a dictionary encoding, adding it if it's new."""
+    value_id = ids.get(value)
+    if value_id is None:
+        value_id = ids[value] = len(values)
+        values.append(value)
+    return value_id
+
+
+def _slice(text, start, bounds):
+    """Split `text`, which starts at `start`, at the `bounds` offsets."""
+    texts = []
+    begin = 0
+    for end in bounds:
+        end -= start
+        texts.append(text[begin:end])
+        begin = end
+    return texts
+
+
+def _dictionary_sizeof(ids, values):
+    return sys.getsizeof(ids) + sys.getsizeof(values) + sum(sys.getsizeof(value) for value in values)
+
+
+# List the names that this module "really" exports.
+__all__ = (
+    'URLTable',
+)